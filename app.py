@@ -1,128 +1,289 @@
-from fastapi import FastAPI, UploadFile, File
+import time
+
+PROCESS_START = time.perf_counter()
+
+from fastapi import FastAPI, UploadFile, File, Query, Request, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 import pandas as pd
 from pathlib import Path
+import asyncio
+import hashlib
 import io
-from groq import Groq
-import os
-
-app = FastAPI(title="DecisioAI Backend")
+import logging
+import threading
+
+from cache import create_cache
+from explanations import (
+    EXPLANATIONS_PATH,
+    build_index,
+    decision_engine,
+    explanation_messages,
+    input_hash,
+    read_artifact
+)
+from forecasting import forecast_kpis
+from llm_providers import create_provider, provider_config
+from llm_scheduler import (
+    LLMScheduler,
+    LLMQueueFull,
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    estimate_tokens
+)
+from validation import validate_kpi_frame
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("decisioai")
 
 BASE_DIR = Path(__file__).resolve().parent
 KPI_PATH = BASE_DIR / "data" / "processed" / "saas_kpis.csv"
 
-# 🔴 PUT YOUR REAL GROQ KEY HERE (FOR LOCAL TESTING ONLY)
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-
 
 # ==========================================
 # Utility Functions
 # ==========================================
 
+# Shared across workers when DECISIOAI_CACHE_BACKEND=sqlite
+cache = create_cache()
+
+# Admission control for outbound LLM calls
+llm_scheduler = LLMScheduler()
+
+# KPI table, re-read only when the file changes on disk. With a shared
+# cache the full table lives once in the cache file and each worker only
+# keeps the latest row.
+_kpi_cache = {"version": None, "df": None, "latest": None}
+
+# Materialized explanations index, re-read when the artifact changes
+_materialized = {"mtime": None, "index": {}}
+
+_llm_provider = None
+
+startup_state = {
+    "ready": False,
+    "phases": {},
+    "errors": {},
+    "time_to_first_response_s": None
+}
+
+
+def kpi_version():
+    return f"{KPI_PATH}:{KPI_PATH.stat().st_mtime}"
+
+
+def load_kpis():
+    version = kpi_version()
+
+    if _kpi_cache["version"] == version and _kpi_cache["df"] is not None:
+        return _kpi_cache["df"]
+
+    df = cache.get(f"kpis:{version}")
+
+    if df is None:
+        df = pd.read_csv(KPI_PATH).sort_values("month")
+        cache.set(f"kpis:{version}", df)
+
+    _kpi_cache["df"] = None if cache.shared else df
+    _kpi_cache["latest"] = df.iloc[-1]
+    _kpi_cache["version"] = version
+
+    return df
+
+
 def get_latest_kpis():
-    df = pd.read_csv(KPI_PATH)
-    df = df.sort_values("month")
-    return df.iloc[-1]
+    if _kpi_cache["version"] != kpi_version():
+        load_kpis()
 
+    return _kpi_cache["latest"]
 
-def decision_engine(latest):
-    if latest["revenue_churn_pct"] > 0.10:
-        return {
-            "decision_type": "RETENTION_PRIORITY",
-            "confidence": "HIGH",
-            "reason": "Revenue churn is above 10%"
-        }
 
-    elif latest["net_mrr_growth_pct"] < 0.05:
-        return {
-            "decision_type": "GROWTH_SLOWDOWN",
-            "confidence": "MEDIUM",
-            "reason": "Net MRR growth is below 5%"
-        }
+def load_materialized():
+    if not EXPLANATIONS_PATH.exists():
+        return {}
 
-    else:
-        return {
-            "decision_type": "STABLE_GROWTH",
-            "confidence": "MEDIUM",
-            "reason": "Business metrics are stable"
-        }
+    mtime = EXPLANATIONS_PATH.stat().st_mtime
 
+    if _materialized["mtime"] != mtime:
+        _materialized["index"] = build_index(read_artifact())
+        _materialized["mtime"] = mtime
 
-def validate_uploaded_data(df):
+    return _materialized["index"]
 
-    required_columns = [
-        "month",
-        "starting_mrr",
-        "new_mrr",
-        "expansion_mrr",
-        "churned_mrr",
-        "ending_mrr",
-        "active_users",
-        "new_customers",
-        "churned_customers",
-        "marketing_spend",
-        "net_mrr_growth_pct",
-        "revenue_churn_pct",
-        "customer_churn_pct"
-    ]
 
-    missing = [col for col in required_columns if col not in df.columns]
+def get_llm_provider():
+    global _llm_provider
 
-    if missing:
-        return False, f"Missing required columns: {missing}"
+    if _llm_provider is None:
+        # Selected by LLM_PROVIDER / LLM_MODEL (groq by default)
+        _llm_provider = create_provider()
 
-    if df.isnull().any().any():
-        return False, "File contains missing values."
+    return _llm_provider
 
-    numeric_cols = [
-        "starting_mrr",
-        "new_mrr",
-        "expansion_mrr",
-        "churned_mrr",
-        "ending_mrr"
-    ]
 
-    if (df[numeric_cols] < 0).any().any():
-        return False, "Revenue values cannot be negative."
+def complete_chat(messages, priority=PRIORITY_BATCH):
+    provider = get_llm_provider()
+    key = "llm:" + input_hash(provider.name, provider.model, messages)
+
+    answer = cache.get(key)
 
-    return True, "Valid"
+    if answer is None:
+        if provider.rate_limited:
+            answer = llm_scheduler.submit(
+                lambda: provider.complete(messages, temperature=0.3),
+                priority=priority,
+                tokens=estimate_tokens(messages)
+            )
+        else:
+            # Local and stub providers have no quota to protect
+            answer = provider.complete(messages, temperature=0.3)
+        cache.set(key, answer)
+
+    return answer
+
+
+SNAPSHOT_COLUMNS = [
+    "ending_mrr",
+    "net_mrr_growth_pct",
+    "revenue_churn_pct",
+    "customer_churn_pct",
+    "active_users"
+]
+
+
+def upload_cache_key(upload_id):
+    # Explanations depend on the LLM, so a provider/model change is a miss
+    provider, model = provider_config()
+    return f"upload:{provider}:{model}:{upload_id}"
+
+
+def kpi_snapshot(latest):
+    return {col: float(latest[col]) for col in SNAPSHOT_COLUMNS}
+
+
+def validate_uploaded_data(df):
+
+    violation_count, violations = validate_kpi_frame(df)
+
+    if violation_count == 0:
+        return True, "Valid", []
+
+    first = violations[0]
+    where = f"Row {first['row']}, {first['column']}: " if first["row"] else ""
+    message = f"{where}{first['message']} ({violation_count} issue(s) found)"
+
+    return False, message, violations
 
 
 def call_groq(latest, decision):
 
-    client = Groq(api_key=GROQ_API_KEY)
+    messages = explanation_messages(latest, decision)
 
-    system_message = """
-You are a sharp SaaS startup advisor.
-Be analytical, concise, and practical.
-Only use provided KPIs.
-Do not invent numbers.
-"""
+    # Precomputed by scripts/materialize_explanations.py
+    explanation = load_materialized().get(input_hash(*provider_config(), messages))
 
-    user_message = f"""
-Business Context:
+    if explanation is None:
+        explanation = complete_chat(messages)
 
-Decision: {decision['decision_type']}
-Reason: {decision['reason']}
+    return explanation
 
-KPIs:
-Revenue churn: {latest['revenue_churn_pct']:.2f}
-Net MRR growth: {latest['net_mrr_growth_pct']:.2f}
-Customer churn: {latest['customer_churn_pct']:.2f}
 
-Explain clearly what the founder should focus on.
-"""
+# ==========================================
+# Startup
+# ==========================================
+
+# Only these phases gate /readyz; the others (LLM provider, explanations,
+# forecast cache) degrade individual routes, not KPI and forecast traffic.
+REQUIRED_PHASES = {"load_kpis"}
+
+STARTUP_RETRY_MAX_SECONDS = 60
+
+_shutdown = threading.Event()
+
+
+def run_phase(name, func):
+    start = time.perf_counter()
+
+    try:
+        func()
+    except Exception as exc:
+        startup_state["errors"][name] = str(exc)
+        logger.warning("Startup phase %s failed: %s", name, exc)
+        return False
+
+    elapsed = time.perf_counter() - start
+    startup_state["errors"].pop(name, None)
+    startup_state["phases"][name] = round(elapsed, 4)
+    logger.info("Startup phase %s took %.3fs", name, elapsed)
+    return True
+
+
+def update_readiness():
+    startup_state["ready"] = not REQUIRED_PHASES & startup_state["errors"].keys()
+
+
+def warm_up():
+    phases = [
+        ("load_kpis", load_kpis),
+        ("llm_provider", get_llm_provider),
+        ("materialized_explanations", load_materialized),
+        ("forecast_cache", lambda: forecast_kpis(load_kpis()))
+    ]
+
+    pending = [(name, func) for name, func in phases if not run_phase(name, func)]
+    update_readiness()
 
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": user_message}
-        ],
-        temperature=0.3
+    logger.info(
+        "Warm-up finished %.3fs after process start (ready=%s)",
+        time.perf_counter() - PROCESS_START,
+        startup_state["ready"]
     )
 
-    return response.choices[0].message.content
+    # Retry failed phases with exponential backoff until they succeed
+    delay = 1
+
+    while pending and not _shutdown.wait(delay):
+        pending = [(name, func) for name, func in pending if not run_phase(name, func)]
+        update_readiness()
+        delay = min(delay * 2, STARTUP_RETRY_MAX_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Warm up in the background so the port binds and /healthz answers
+    # immediately; /readyz reports 503 until the required phases succeed.
+    task = asyncio.create_task(asyncio.to_thread(warm_up))
+    yield
+    _shutdown.set()
+    await task
+
+
+app = FastAPI(title="DecisioAI Backend", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_first_response(request: Request, call_next):
+    response = await call_next(request)
+
+    if (
+        startup_state["time_to_first_response_s"] is None
+        and request.url.path not in ("/healthz", "/readyz")
+    ):
+        elapsed = time.perf_counter() - PROCESS_START
+        startup_state["time_to_first_response_s"] = round(elapsed, 4)
+        logger.info("First response %.3fs after process start", elapsed)
+
+    return response
+
+
+@app.exception_handler(LLMQueueFull)
+async def llm_queue_full(request: Request, exc: LLMQueueFull):
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={"error": str(exc), "retry_after": exc.retry_after}
+    )
 
 
 # ==========================================
@@ -142,6 +303,32 @@ def home():
     return {"message": "Welcome to DecisioAI Backend 🚀"}
 
 
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    status_code = 200 if startup_state["ready"] else 503
+
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "ready": startup_state["ready"],
+            "phases": startup_state["phases"],
+            "errors": startup_state["errors"],
+            "degraded": sorted(startup_state["errors"].keys() - REQUIRED_PHASES),
+            "time_to_first_response_s": startup_state["time_to_first_response_s"]
+        }
+    )
+
+
+@app.get("/llm/stats")
+def llm_stats():
+    return llm_scheduler.stats()
+
+
 @app.get("/analyze")
 def analyze_business():
 
@@ -151,6 +338,7 @@ def analyze_business():
 
     return {
         "month": latest["month"],
+        "kpis": kpi_snapshot(latest),
         "decision": decision,
         "ai_explanation": explanation
     }
@@ -160,24 +348,48 @@ def analyze_business():
 async def upload_and_analyze(file: UploadFile = File(...)):
 
     contents = await file.read()
+    upload_id = hashlib.sha256(contents).hexdigest()
+
+    cached = cache.get(upload_cache_key(upload_id))
+
+    if cached is not None:
+        return cached
+
     df = pd.read_csv(io.BytesIO(contents))
 
-    is_valid, message = validate_uploaded_data(df)
+    is_valid, message, violations = validate_uploaded_data(df)
 
     if not is_valid:
-        return {"error": message}
+        return {"error": message, "violations": violations}
 
     df = df.sort_values("month")
     latest = df.iloc[-1]
 
     decision = decision_engine(latest)
-    explanation = call_groq(latest, decision)
+    explanation = await asyncio.to_thread(call_groq, latest, decision)
 
-    return {
+    result = {
+        "upload_id": upload_id,
         "month": latest["month"],
+        "kpis": kpi_snapshot(latest),
         "decision": decision,
         "ai_explanation": explanation
     }
+    cache.set(upload_cache_key(upload_id), result)
+
+    return result
+
+
+@app.get("/uploads/{upload_id}")
+def get_upload_result(upload_id: str):
+    """Result of an earlier upload, looked up by the SHA-256 of the file."""
+
+    result = cache.get(upload_cache_key(upload_id))
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="Unknown upload.")
+
+    return result
 
 
 @app.post("/ask")
@@ -186,8 +398,6 @@ def ask_business(request: AskRequest):
     latest = get_latest_kpis()
     decision = decision_engine(latest)
 
-    client = Groq(api_key=GROQ_API_KEY)
-
     system_message = """
 You are an AI SaaS business copilot.
 Be analytical and concise.
@@ -212,19 +422,29 @@ Founder Question:
 Answer clearly using the data.
 """
 
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": user_message}
-        ],
-        temperature=0.3
-    )
-
-    answer = response.choices[0].message.content
+    answer = complete_chat([
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": user_message}
+    ], priority=PRIORITY_INTERACTIVE)
 
     return {
         "question": request.question,
         "decision_context": decision,
         "answer": answer
     }
+
+
+@app.get("/forecast")
+def forecast_business(horizon: int = Query(3, ge=1, le=24)):
+
+    key = f"forecast:{kpi_version()}:{horizon}"
+    forecast = cache.get(key)
+
+    if forecast is None:
+        forecast = forecast_kpis(load_kpis(), horizon)
+        cache.set(key, forecast)
+
+    return {
+        "horizon": horizon,
+        "forecast": forecast
+    }
@@ -0,0 +1,225 @@
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+# ==========================================
+# Settings
+# ==========================================
+
+BASE_DIR = Path(__file__).resolve().parent
+
+CACHE_BACKEND = os.getenv("DECISIOAI_CACHE_BACKEND", "memory")
+CACHE_PATH = os.getenv("DECISIOAI_CACHE_PATH", str(BASE_DIR / "data" / "cache.sqlite3"))
+CACHE_MAX_ITEMS = int(os.getenv("DECISIOAI_CACHE_MAX_ITEMS", "512"))
+# Total size of the stored (pickled) values for the SQLite backend
+CACHE_MAX_BYTES = int(os.getenv("DECISIOAI_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Hits refresh an entry's LRU timestamp at most this often
+CACHE_TOUCH_INTERVAL = 30
+
+logger = logging.getLogger("decisioai")
+
+
+# ==========================================
+# Backends
+# ==========================================
+
+class InProcessCache:
+    """LRU cache private to the current process."""
+
+    shared = False
+
+    def __init__(self, max_items=CACHE_MAX_ITEMS):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class SQLiteCache:
+    """
+    LRU cache in a local SQLite file (WAL mode), shared by every worker
+    process on the host. Values are pickled; the least recently used
+    entries are evicted once the total value size exceeds max_bytes or
+    the entry count exceeds max_items.
+
+    Reads stay read-only unless an entry's LRU timestamp is stale, and
+    SQLite errors (e.g. a locked database) degrade to a cache miss.
+    """
+
+    shared = True
+
+    def __init__(self, path=CACHE_PATH, max_items=CACHE_MAX_ITEMS, max_bytes=CACHE_MAX_BYTES):
+        self.path = str(path)
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL DEFAULT 0,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+            self._add_size_column(conn)
+
+    @staticmethod
+    def _add_size_column(conn):
+        # Cache files created before size tracking lack the column
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(cache)")}
+
+        if "size" in columns:
+            return
+
+        try:
+            conn.execute("ALTER TABLE cache ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            conn.execute("UPDATE cache SET size = LENGTH(value)")
+        except sqlite3.OperationalError:
+            # Another worker added it first
+            pass
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            self._enable_wal(conn)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+
+        return conn
+
+    @staticmethod
+    def _enable_wal(conn, attempts=50):
+        # Switching to WAL ignores the busy timeout, so workers starting
+        # together retry until the first one has converted the file.
+        for _ in range(attempts):
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                return
+            except sqlite3.OperationalError:
+                time.sleep(0.05)
+
+        conn.execute("PRAGMA journal_mode=WAL")
+
+    def get(self, key):
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, accessed_at FROM cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            value = pickle.loads(row[0])
+        except (sqlite3.Error, pickle.UnpicklingError) as exc:
+            logger.warning("Cache read failed for %s: %s", key, exc)
+            return None
+
+        now = time.time()
+
+        if now - row[1] > CACHE_TOUCH_INTERVAL:
+            try:
+                with conn:
+                    conn.execute(
+                        "UPDATE cache SET accessed_at = ? WHERE key = ?",
+                        (now, key)
+                    )
+            except sqlite3.Error:
+                # Best effort: a missed touch only makes eviction less exact
+                pass
+
+        return value
+
+    def set(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        if len(blob) > self.max_bytes:
+            logger.warning("Cache value for %s is larger than the cache, not stored", key)
+            return
+
+        try:
+            conn = self._connect()
+
+            with conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO cache (key, value, size, accessed_at)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (key, blob, len(blob), time.time())
+                )
+                count, total = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+                ).fetchone()
+
+                if count > self.max_items or total > self.max_bytes:
+                    # Keep the most recently used entries that fit both limits
+                    conn.execute(
+                        """
+                        DELETE FROM cache WHERE key IN (
+                            SELECT key FROM (
+                                SELECT
+                                    key,
+                                    ROW_NUMBER() OVER recent AS position,
+                                    SUM(size) OVER recent AS kept_bytes
+                                FROM cache
+                                WINDOW recent AS (ORDER BY accessed_at DESC, key)
+                            )
+                            WHERE position > ? OR kept_bytes > ?
+                        )
+                        """,
+                        (self.max_items, self.max_bytes)
+                    )
+        except sqlite3.Error as exc:
+            logger.warning("Cache write failed for %s: %s", key, exc)
+
+    def clear(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM cache")
+
+
+# ==========================================
+# Factory
+# ==========================================
+
+BACKENDS = {
+    "memory": InProcessCache,
+    "sqlite": SQLiteCache,
+}
+
+
+def create_cache(backend=CACHE_BACKEND):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown cache backend: {backend}")
+    return BACKENDS[backend]()
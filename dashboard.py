@@ -1,10 +1,73 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+import hashlib
 
 BACKEND_URL = "https://decisioai.onrender.com"
 
 st.set_page_config(page_title="DecisioAI", layout="wide")
 
+
+# ==========================================
+# Backend Client
+# ==========================================
+
+class BackendError(Exception):
+    pass
+
+
+@st.cache_resource
+def get_session():
+    # One pooled keep-alive session shared by every rerun and user
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def check_response(response):
+    if response.status_code == 429:
+        retry_after = response.headers.get("Retry-After", "a few")
+        raise BackendError(f"Backend is busy. Try again in {retry_after} seconds.")
+
+    if response.status_code != 200:
+        raise BackendError("Backend error.")
+
+    return response.json()
+
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def analyze_upload(upload_id, _file_bytes, file_name):
+    """
+    Cached per file content hash. The backend is asked for an earlier
+    result first, so the file is only sent when the server hasn't seen it.
+    """
+    session = get_session()
+
+    response = session.get(f"{BACKEND_URL}/uploads/{upload_id}")
+
+    if response.status_code == 200:
+        return response.json()
+
+    response = session.post(
+        f"{BACKEND_URL}/upload-and-analyze",
+        files={"file": (file_name, _file_bytes, "text/csv")}
+    )
+
+    return check_response(response)
+
+
+@st.cache_data(show_spinner=False, ttl=300)
+def ask_backend(question):
+    response = get_session().post(
+        f"{BACKEND_URL}/ask",
+        json={"question": question}
+    )
+
+    return check_response(response)
+
+
 st.title("DecisioAI — AI Decision Copilot")
 st.markdown("Turn SaaS metrics into actionable business decisions.")
 st.markdown("---")
@@ -23,16 +86,22 @@ if uploaded_file is not None:
 
         with st.spinner("Analyzing business metrics..."):
 
-            response = requests.post(
-                f"{BACKEND_URL}/upload-and-analyze",
-                files={"file": uploaded_file}
-            )
+            file_bytes = uploaded_file.getvalue()
+            upload_id = hashlib.sha256(file_bytes).hexdigest()
 
-            if response.status_code == 200:
-                result = response.json()
+            try:
+                result = analyze_upload(upload_id, file_bytes, uploaded_file.name)
+            except BackendError as exc:
+                st.error(str(exc))
+                result = None
+
+            if result is not None:
 
                 if "error" in result:
                     st.error(result["error"])
+
+                    if result.get("violations"):
+                        st.dataframe(result["violations"], use_container_width=True)
                 else:
                     st.success("Analysis Complete")
 
@@ -41,23 +110,22 @@ if uploaded_file is not None:
                     # ==========================================
                     # KPI Metric Cards (Top Section)
                     # ==========================================
-                    st.subheader("📈 Business Snapshot")
+                    kpis = result["kpis"]
 
-                    # These are extracted from AI explanation context
-                    # If you want direct KPI values, we can modify backend to return them too
+                    st.subheader(f"📈 Business Snapshot — {result['month']}")
 
-                    col1, col2, col3 = st.columns(3)
+                    col1, col2, col3, col4 = st.columns(4)
 
-                    # These are approximations from decision logic
-                    # You can enhance backend to return raw KPI numbers later
-                    if decision["decision_type"] == "RETENTION_PRIORITY":
-                        risk_level = "High"
-                    else:
-                        risk_level = "Moderate"
+                    col1.metric("Ending MRR", f"${kpis['ending_mrr']:,.0f}")
+                    col2.metric("Net MRR Growth", f"{kpis['net_mrr_growth_pct']:.1%}")
+                    col3.metric("Revenue Churn", f"{kpis['revenue_churn_pct']:.1%}")
+                    col4.metric("Customer Churn", f"{kpis['customer_churn_pct']:.1%}")
 
-                    col1.metric("Primary Focus", decision["decision_type"])
-                    col2.metric("Confidence", decision["confidence"])
-                    col3.metric("Risk Level", risk_level)
+                    col1, col2, col3 = st.columns(3)
+
+                    col1.metric("Active Users", f"{kpis['active_users']:,.0f}")
+                    col2.metric("Primary Focus", decision["decision_type"])
+                    col3.metric("Confidence", decision["confidence"])
 
                     st.markdown("---")
 
@@ -91,9 +159,6 @@ if uploaded_file is not None:
                         unsafe_allow_html=True
                     )
 
-            else:
-                st.error("Backend error.")
-
 
 st.markdown("---")
 
@@ -112,13 +177,13 @@ if st.button("Ask AI"):
     else:
         with st.spinner("Thinking..."):
 
-            response = requests.post(
-                f"{BACKEND_URL}/ask",
-                json={"question": question}
-            )
+            try:
+                result = ask_backend(question.strip())
+            except BackendError as exc:
+                st.error(str(exc))
+                result = None
 
-            if response.status_code == 200:
-                result = response.json()
+            if result is not None:
 
                 decision = result["decision_context"]
 
@@ -155,6 +220,3 @@ if st.button("Ask AI"):
                     """,
                     unsafe_allow_html=True
                 )
-
-            else:
-                st.error("Backend error.")
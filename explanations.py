@@ -0,0 +1,172 @@
+import hashlib
+import json
+from pathlib import Path
+
+from llm_providers import complete_many
+
+
+# ==========================================
+# Settings
+# ==========================================
+
+BASE_DIR = Path(__file__).resolve().parent
+EXPLANATIONS_PATH = BASE_DIR / "data" / "processed" / "saas_explanations.json"
+
+# Bump when the artifact layout changes; older files are ignored
+ARTIFACT_VERSION = 1
+
+SYSTEM_MESSAGE = """
+You are a sharp SaaS startup advisor.
+Be analytical, concise, and practical.
+Only use provided KPIs.
+Do not invent numbers.
+"""
+
+
+# ==========================================
+# Decision + Prompt
+# ==========================================
+
+def decision_engine(latest):
+    if latest["revenue_churn_pct"] > 0.10:
+        return {
+            "decision_type": "RETENTION_PRIORITY",
+            "confidence": "HIGH",
+            "reason": "Revenue churn is above 10%"
+        }
+
+    elif latest["net_mrr_growth_pct"] < 0.05:
+        return {
+            "decision_type": "GROWTH_SLOWDOWN",
+            "confidence": "MEDIUM",
+            "reason": "Net MRR growth is below 5%"
+        }
+
+    else:
+        return {
+            "decision_type": "STABLE_GROWTH",
+            "confidence": "MEDIUM",
+            "reason": "Business metrics are stable"
+        }
+
+
+def explanation_messages(latest, decision):
+    user_message = f"""
+Business Context:
+
+Decision: {decision['decision_type']}
+Reason: {decision['reason']}
+
+KPIs:
+Revenue churn: {latest['revenue_churn_pct']:.2f}
+Net MRR growth: {latest['net_mrr_growth_pct']:.2f}
+Customer churn: {latest['customer_churn_pct']:.2f}
+
+Explain clearly what the founder should focus on.
+"""
+
+    return [
+        {"role": "system", "content": SYSTEM_MESSAGE},
+        {"role": "user", "content": user_message}
+    ]
+
+
+def input_hash(provider, model, messages):
+    """
+    Everything the explanation depends on: backend, model and prompt.
+    Takes the configured names, so lookups don't need a live client.
+    """
+    payload = json.dumps([provider, model, messages], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# ==========================================
+# Artifact
+# ==========================================
+
+def _empty_artifact():
+    return {"version": ARTIFACT_VERSION, "entries": {}}
+
+
+def read_artifact(path=EXPLANATIONS_PATH):
+    path = Path(path)
+
+    if not path.exists():
+        return _empty_artifact()
+
+    artifact = json.loads(path.read_text(encoding="utf-8"))
+
+    if artifact.get("version") != ARTIFACT_VERSION:
+        return _empty_artifact()
+
+    return artifact
+
+
+def build_index(artifact):
+    """input hash -> explanation, so lookups don't depend on the month."""
+    return {
+        entry["input_hash"]: entry["explanation"]
+        for entry in artifact["entries"].values()
+    }
+
+
+def materialize(df, provider, path=EXPLANATIONS_PATH):
+    """
+    Explain every month of a KPI table and write the artifact.
+
+    Months whose input hash matches the existing artifact are kept as is;
+    only new or changed months are sent to the LLM, concurrently. Months
+    whose completion fails are left out, so the next run retries only them.
+    Returns (generated, reused, failures) with failures as {month: error}.
+    """
+    artifact = read_artifact(path)
+    previous = build_index(artifact)
+
+    entries = {}
+    pending = []
+
+    for _, row in df.sort_values("month").iterrows():
+        decision = decision_engine(row)
+        messages = explanation_messages(row, decision)
+        key = input_hash(provider.name, provider.model, messages)
+
+        entries[str(row["month"])] = {
+            "input_hash": key,
+            "decision": decision,
+            "explanation": previous.get(key)
+        }
+
+        if key not in previous:
+            pending.append((str(row["month"]), messages))
+
+    reused = len(entries) - len(pending)
+
+    answers = complete_many(
+        provider,
+        [messages for _, messages in pending],
+        return_exceptions=True
+    )
+
+    failures = {}
+
+    for (month, _), answer in zip(pending, answers):
+        if isinstance(answer, Exception):
+            failures[month] = str(answer)
+            del entries[month]
+        else:
+            entries[month]["explanation"] = answer
+
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "provider": provider.name,
+        "model": provider.model,
+        "entries": entries
+    }
+
+    path = Path(path)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(artifact, indent=2), encoding="utf-8")
+    # Atomic swap so the API never reads a half-written file
+    tmp_path.replace(path)
+
+    return len(pending) - len(failures), reused, failures
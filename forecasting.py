@@ -0,0 +1,251 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# ==========================================
+# Settings
+# ==========================================
+
+FORECAST_COLUMNS = ["ending_mrr", "new_mrr", "churned_mrr"]
+
+# Holt's linear exponential smoothing (level + trend) on log1p(MRR), so a
+# constant growth rate is a straight line. alpha/beta are picked per series
+# from this grid by the lowest one-step-ahead squared error.
+SMOOTHING_GRID = np.linspace(0.1, 0.9, 9)
+
+# Series with fewer observed months (after leading zeros) than this skip
+# the grid search and extrapolate their median monthly log change instead
+MIN_FIT_POINTS = 6
+
+# Cap on the monthly log trend used for forecasts (log 2 = doubling)
+MAX_LOG_TREND = np.log(2)
+
+MAX_CACHED_FITS = 256
+
+# dataset version -> fitted state
+_fit_cache = OrderedDict()
+
+_ALPHAS, _BETAS = (grid.ravel() for grid in np.meshgrid(SMOOTHING_GRID, SMOOTHING_GRID))
+
+
+# ==========================================
+# Model
+# ==========================================
+
+def dataset_version(df):
+    """Hash of the months and forecast columns, used as the cache key."""
+    digest = hashlib.sha1()
+    digest.update("|".join(df["month"].astype(str)).encode())
+    digest.update(
+        np.ascontiguousarray(df[FORECAST_COLUMNS].to_numpy(dtype="float64")).tobytes()
+    )
+    return digest.hexdigest()
+
+
+def _log_values(df):
+    return np.log1p(np.maximum(df[FORECAST_COLUMNS].to_numpy(dtype="float64"), 0))
+
+
+def _active_mask(values):
+    """True from each series' first non-zero month onwards."""
+    return np.maximum.accumulate(values > 0, axis=0)
+
+
+def _median_trend(values, active, limit=None):
+    """
+    Median month-over-month log change, ignoring leading zeros. With limit,
+    only the first limit observed months count, so appending months
+    doesn't move it.
+    """
+    diffs = np.diff(values, axis=0)
+    valid = active[:-1]
+
+    if limit is not None:
+        valid = valid & (np.cumsum(active, axis=0)[:-1] < limit)
+
+    diffs[~valid] = np.nan
+
+    if len(diffs) == 0:
+        return np.zeros(values.shape[1])
+
+    with np.errstate(all="ignore"):
+        trend = np.nanmedian(np.where(np.isnan(diffs).all(axis=0), 0, diffs), axis=0)
+
+    return np.nan_to_num(trend)
+
+
+def _holt_step(level, trend, observed, alpha, beta):
+    new_level = alpha * observed + (1 - alpha) * (level + trend)
+    new_trend = beta * (new_level - level) + (1 - beta) * trend
+    return new_level, new_trend
+
+
+def _holt_fit(values):
+    """
+    Fit on a (months, series) array of log values.
+
+    Every alpha/beta pair in the grid is run for every series at once, so
+    several metrics or tenants cost one pass over the months. Returns the
+    per-series alpha, beta, level and trend of the best pair.
+    """
+    grid = len(_ALPHAS)
+    alpha = _ALPHAS[:, None]
+    beta = _BETAS[:, None]
+
+    active = _active_mask(values)
+    initial_trend = _median_trend(values, active, limit=MIN_FIT_POINTS)
+
+    # Until a series' first non-zero month, it is held at the observed
+    # value with the robust initial trend, and errors are not scored
+    level = np.tile(values[0], (grid, 1))
+    trend = np.tile(initial_trend, (grid, 1))
+    sse = np.zeros_like(level)
+
+    for t in range(1, len(values)):
+        observed = values[t]
+        started = active[t - 1]
+
+        sse += np.where(started, (observed - (level + trend)) ** 2, 0)
+        stepped = _holt_step(level, trend, observed, alpha, beta)
+        level = np.where(started, stepped[0], observed)
+        trend = np.where(started, stepped[1], initial_trend)
+
+    best = sse.argmin(axis=0)
+    series = np.arange(values.shape[1])
+
+    fit = {
+        "alpha": _ALPHAS[best],
+        "beta": _BETAS[best],
+        "level": level[best, series],
+        "trend": trend[best, series]
+    }
+
+    # Too little history to fit: last value plus median change
+    short = active.sum(axis=0) < MIN_FIT_POINTS
+    fit["level"] = np.where(short, values[-1], fit["level"])
+    fit["trend"] = np.where(short, _median_trend(values, active), fit["trend"])
+    fit["short"] = short
+
+    return fit
+
+
+def _remember(version, fit):
+    _fit_cache[version] = fit
+    _fit_cache.move_to_end(version)
+    while len(_fit_cache) > MAX_CACHED_FITS:
+        _fit_cache.popitem(last=False)
+
+
+def _prepare(df):
+    if df.empty:
+        raise ValueError("Cannot forecast from an empty KPI table.")
+    return df.sort_values("month").reset_index(drop=True)
+
+
+def fit_forecaster(df):
+    """
+    Return the fitted state for a KPI table.
+
+    Reuses a cached fit when the dataset is unchanged. When exactly one
+    month was appended to a cached dataset with enough history, the cached
+    alpha/beta are kept and only one smoothing step is applied; the grid
+    search reruns on the next full refit.
+    """
+    df = _prepare(df)
+    version = dataset_version(df)
+
+    if version in _fit_cache:
+        _fit_cache.move_to_end(version)
+        return _fit_cache[version]
+
+    values = _log_values(df)
+    previous = None
+
+    if len(df) > 2:
+        previous = _fit_cache.get(dataset_version(df.iloc[:-1]))
+
+    if previous is not None and not previous["short"].any():
+        params = {
+            "alpha": previous["alpha"],
+            "beta": previous["beta"],
+            "short": previous["short"]
+        }
+        params["level"], params["trend"] = _holt_step(
+            previous["level"], previous["trend"], values[-1],
+            previous["alpha"], previous["beta"]
+        )
+    else:
+        params = _holt_fit(values)
+
+    fit = {
+        "version": version,
+        "last_month": str(df["month"].iloc[-1]),
+        "months": len(df),
+        **params
+    }
+    _remember(version, fit)
+
+    return fit
+
+
+def fit_many(datasets):
+    """
+    Batch-fit many tenant KPI tables.
+
+    Tenants with the same number of months are stacked side by side and
+    fitted in a single vectorized pass. Returns tenant -> fitted state.
+    """
+    fits = {}
+    groups = {}
+
+    for tenant, df in datasets.items():
+        df = _prepare(df)
+        version = dataset_version(df)
+
+        if version in _fit_cache:
+            fits[tenant] = _fit_cache[version]
+        else:
+            groups.setdefault(len(df), []).append((tenant, df, version))
+
+    width = len(FORECAST_COLUMNS)
+
+    for _, members in groups.items():
+        stacked = np.hstack([_log_values(df) for _, df, _ in members])
+        params = _holt_fit(stacked)
+
+        for i, (tenant, df, version) in enumerate(members):
+            columns = slice(i * width, (i + 1) * width)
+            fit = {
+                "version": version,
+                "last_month": str(df["month"].iloc[-1]),
+                "months": len(df),
+                **{name: value[columns].copy() for name, value in params.items()}
+            }
+            _remember(version, fit)
+            fits[tenant] = fit
+
+    return fits
+
+
+def forecast_from_fit(fit, horizon=3):
+    last_period = pd.Period(fit["last_month"], freq="M")
+    forecast = []
+
+    for step in range(1, horizon + 1):
+        trend = np.clip(fit["trend"], -MAX_LOG_TREND, MAX_LOG_TREND)
+        predicted = np.maximum(np.expm1(fit["level"] + step * trend), 0)
+        row = {"month": str(last_period + step)}
+        row.update({
+            col: round(float(value), 2)
+            for col, value in zip(FORECAST_COLUMNS, predicted)
+        })
+        forecast.append(row)
+
+    return forecast
+
+
+def forecast_kpis(df, horizon=3):
+    return forecast_from_fit(fit_forecaster(df), horizon)
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_scheduler import LLMQueueFull
+
+
+# ==========================================
+# Settings
+# ==========================================
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")
+LLM_MODEL = os.getenv("LLM_MODEL")
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+# (connect, read) seconds; read covers the gap between streamed chunks
+OLLAMA_TIMEOUT = (
+    float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5")),
+    float(os.getenv("OLLAMA_READ_TIMEOUT", "120"))
+)
+LLM_FANOUT_WORKERS = int(os.getenv("LLM_FANOUT_WORKERS", "4"))
+
+DEFAULT_MODELS = {
+    "groq": "llama-3.1-8b-instant",
+    "ollama": "tinyllama",
+    "stub": "stub"
+}
+
+
+# ==========================================
+# Providers
+# ==========================================
+
+class GroqProvider:
+    name = "groq"
+    # Hosted API with per-minute quotas: calls go through the LLM scheduler
+    rate_limited = True
+
+    def __init__(self, model=None, api_key=None):
+        # groq is only imported when this provider is used
+        from groq import Groq
+
+        self.model = model or DEFAULT_MODELS["groq"]
+        # No SDK retries: each admitted call is one upstream request, and
+        # 429s go back to the caller as Retry-After instead of being replayed
+        self.client = Groq(
+            api_key=api_key or os.getenv("GROQ_API_KEY"),
+            max_retries=0
+        )
+
+    def _create(self, **kwargs):
+        from groq import RateLimitError
+
+        try:
+            return self.client.chat.completions.create(model=self.model, **kwargs)
+        except RateLimitError as exc:
+            retry_after = exc.response.headers.get("retry-after", "1")
+            try:
+                retry_after = max(1, math.ceil(float(retry_after)))
+            except ValueError:
+                retry_after = 1
+            raise LLMQueueFull("LLM provider rate limit reached.", retry_after) from exc
+
+    def complete(self, messages, temperature=0.3):
+        response = self._create(messages=messages, temperature=temperature)
+        return response.choices[0].message.content
+
+    def stream(self, messages, temperature=0.3):
+        chunks = self._create(messages=messages, temperature=temperature, stream=True)
+        for chunk in chunks:
+            text = chunk.choices[0].delta.content
+            if text:
+                yield text
+
+
+class OllamaProvider:
+    name = "ollama"
+    rate_limited = False
+
+    def __init__(self, model=None, base_url=OLLAMA_URL, timeout=OLLAMA_TIMEOUT):
+        import requests
+
+        self.model = model or DEFAULT_MODELS["ollama"]
+        self.url = f"{base_url.rstrip('/')}/api/chat"
+        self.timeout = timeout
+        # Kept-alive connection reused across calls and threads
+        self.session = requests.Session()
+
+    def _payload(self, messages, temperature, stream):
+        return {
+            "model": self.model,
+            "messages": messages,
+            "options": {"temperature": temperature},
+            "stream": stream
+        }
+
+    def complete(self, messages, temperature=0.3):
+        response = self.session.post(
+            self.url,
+            json=self._payload(messages, temperature, False),
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()["message"]["content"]
+
+    def stream(self, messages, temperature=0.3):
+        with self.session.post(
+            self.url,
+            json=self._payload(messages, temperature, True),
+            stream=True,
+            timeout=self.timeout
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                text = chunk.get("message", {}).get("content")
+                if text:
+                    yield text
+                if chunk.get("done"):
+                    break
+
+
+class StubProvider:
+    """Deterministic offline provider for tests, demos and benchmarks."""
+
+    name = "stub"
+    rate_limited = False
+
+    def __init__(self, model=None):
+        self.model = model or DEFAULT_MODELS["stub"]
+
+    def complete(self, messages, temperature=0.3):
+        prompt = messages[-1]["content"]
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:8]
+        lines = [line.strip() for line in prompt.splitlines() if line.strip()]
+        context = "; ".join(line for line in lines if ":" in line and not line.endswith(":"))
+        return f"[stub {digest}] {context}"
+
+    def stream(self, messages, temperature=0.3):
+        for word in self.complete(messages, temperature).split(" "):
+            yield word + " "
+
+
+PROVIDERS = {
+    "groq": GroqProvider,
+    "ollama": OllamaProvider,
+    "stub": StubProvider
+}
+
+
+def provider_config(name=LLM_PROVIDER, model=LLM_MODEL):
+    """(provider, model) from configuration, without building a client."""
+    return name, model or DEFAULT_MODELS.get(name)
+
+
+def create_provider(name=LLM_PROVIDER, model=LLM_MODEL):
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {name}")
+    return PROVIDERS[name](model=model)
+
+
+# ==========================================
+# Fan-out
+# ==========================================
+
+def complete_many(
+    provider,
+    message_lists,
+    temperature=0.3,
+    max_workers=LLM_FANOUT_WORKERS,
+    return_exceptions=False
+):
+    """
+    Run several completions concurrently, returning answers in input order.
+
+    With return_exceptions=True a failed completion is returned as its
+    exception instead of aborting the whole batch.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(provider.complete, messages, temperature)
+            for messages in message_lists
+        ]
+
+        if not return_exceptions:
+            return [future.result() for future in futures]
+
+        return [future.exception() or future.result() for future in futures]
@@ -0,0 +1,248 @@
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+
+
+# ==========================================
+# Settings
+# ==========================================
+
+# Budgets are for the whole deployment and split evenly across uvicorn
+# workers (WEB_CONCURRENCY, which uvicorn also reads as its worker count)
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "6000"))
+WORKER_COUNT = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "32"))
+LLM_MAX_WAIT_SECONDS = float(os.getenv("LLM_MAX_WAIT_SECONDS", "30"))
+
+# Lower number is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+# Completion length is unknown up front, so reserve a fixed allowance
+COMPLETION_TOKEN_ESTIMATE = 400
+
+
+class LLMQueueFull(Exception):
+    """Raised when a call is shed instead of queued."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def estimate_tokens(messages):
+    chars = sum(len(message["content"]) for message in messages)
+    return chars // 4 + COMPLETION_TOKEN_ESTIMATE
+
+
+# ==========================================
+# Token Bucket
+# ==========================================
+
+class TokenBucket:
+    """Holds up to one minute of budget, refilled continuously."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until amount can be taken (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount):
+        self._refill()
+        self.available -= min(amount, self.capacity)
+
+
+# ==========================================
+# Scheduler
+# ==========================================
+
+class LLMScheduler:
+    """
+    Admission control for outbound LLM calls.
+
+    Callers block in a priority queue until the request and token buckets
+    have budget and a concurrency slot is free. LLMQueueFull is raised so
+    the API can answer 429 with Retry-After instead of piling up retries
+    when the queue is full, when the budget won't refill within max_wait,
+    or when a call has waited longer than max_wait. A full queue sheds its
+    lowest-priority waiter to make room for a more urgent call.
+    A provider 429 raised by the call pauses admission for its Retry-After.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute=LLM_REQUESTS_PER_MINUTE / WORKER_COUNT,
+        tokens_per_minute=LLM_TOKENS_PER_MINUTE / WORKER_COUNT,
+        max_concurrency=LLM_MAX_CONCURRENCY,
+        max_queue=LLM_MAX_QUEUE,
+        max_wait=LLM_MAX_WAIT_SECONDS
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self._waiting = []
+        self._shed = set()
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+        self._stats = {
+            "completed": 0,
+            "rejected": 0,
+            "shed": 0,
+            "timed_out": 0,
+            "provider_rate_limited": 0,
+            "total_wait_s": 0.0,
+            "max_wait_s": 0.0
+        }
+
+    def _retry_after(self):
+        backlog = len(self._waiting) + self._in_flight
+        return max(1, math.ceil(backlog * 60 / self.requests.capacity))
+
+    def _budget_wait(self, tokens):
+        paused = max(0.0, self._paused_until - time.monotonic())
+        return max(paused, self.requests.wait_time(1), self.tokens.wait_time(tokens))
+
+    def _make_room(self, ticket):
+        """Drop the lowest-priority waiter if ticket outranks it."""
+        lowest = max(self._waiting)
+
+        if lowest < ticket:
+            return False
+
+        self._waiting.remove(lowest)
+        heapq.heapify(self._waiting)
+        self._shed.add(lowest)
+        self._stats["shed"] += 1
+        self._cond.notify_all()
+        return True
+
+    def _admit(self, priority, tokens):
+        with self._cond:
+            ticket = (priority, next(self._sequence))
+
+            if len(self._waiting) >= self.max_queue and not self._make_room(ticket):
+                self._stats["rejected"] += 1
+                raise LLMQueueFull("LLM queue is full.", self._retry_after())
+
+            heapq.heappush(self._waiting, ticket)
+            enqueued = time.monotonic()
+            deadline = enqueued + self.max_wait
+
+            try:
+                while True:
+                    if ticket in self._shed:
+                        self._shed.discard(ticket)
+                        raise LLMQueueFull(
+                            "Shed for a higher-priority LLM call.",
+                            self._retry_after()
+                        )
+
+                    remaining = deadline - time.monotonic()
+
+                    if remaining <= 0:
+                        self._stats["timed_out"] += 1
+                        raise LLMQueueFull("Timed out waiting for LLM capacity.", self._retry_after())
+
+                    if self._waiting[0] == ticket and self._in_flight < self.max_concurrency:
+                        budget_wait = self._budget_wait(tokens)
+
+                        if budget_wait == 0:
+                            break
+
+                        if budget_wait > remaining:
+                            # Won't refill in time: answer now, not at the deadline
+                            self._stats["rejected"] += 1
+                            raise LLMQueueFull(
+                                "LLM budget exhausted.",
+                                max(1, math.ceil(budget_wait))
+                            )
+
+                        self._cond.wait(min(budget_wait, remaining))
+                    else:
+                        self._cond.wait(remaining)
+            except BaseException:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+
+            heapq.heappop(self._waiting)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self._in_flight += 1
+
+            waited = time.monotonic() - enqueued
+            self._stats["total_wait_s"] += waited
+            self._stats["max_wait_s"] = max(self._stats["max_wait_s"], waited)
+
+            # Let the next ticket re-check now that the head has moved
+            self._cond.notify_all()
+
+    def _release(self, retry_after=None):
+        with self._cond:
+            if retry_after:
+                # Provider said 429: hold every queued call until it recovers
+                self._stats["provider_rate_limited"] += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._in_flight -= 1
+            self._stats["completed"] += 1
+            self._cond.notify_all()
+
+    def submit(self, func, priority=PRIORITY_BATCH, tokens=COMPLETION_TOKEN_ESTIMATE):
+        """Run func() once admitted and return its result."""
+        self._admit(priority, tokens)
+        retry_after = None
+
+        try:
+            return func()
+        except LLMQueueFull as exc:
+            retry_after = exc.retry_after
+            raise
+        finally:
+            self._release(retry_after)
+
+    def stats(self):
+        with self._cond:
+            admitted = self._stats["completed"] + self._in_flight
+            average = self._stats["total_wait_s"] / admitted if admitted else 0.0
+
+            return {
+                "queue_depth": len(self._waiting),
+                "in_flight": self._in_flight,
+                "completed": self._stats["completed"],
+                "rejected": self._stats["rejected"],
+                "shed": self._stats["shed"],
+                "timed_out": self._stats["timed_out"],
+                "provider_rate_limited": self._stats["provider_rate_limited"],
+                "paused_s": round(max(0.0, self._paused_until - time.monotonic()), 2),
+                "avg_wait_s": round(average, 4),
+                "max_wait_s": round(self._stats["max_wait_s"], 4),
+                "requests_available": round(self.requests.available, 2),
+                "tokens_available": round(self.tokens.available, 2)
+            }
@@ -1,67 +1,45 @@
 import pandas as pd
 from pathlib import Path
-import requests
+import os
+import sys
+import time
 
-print("🤖 AI EXPLAINER USING OLLAMA HTTP API")
+print("🤖 AI EXPLAINER FOR EVERY MONTH")
 
 # -----------------------------
 # LOAD KPI DATA
 # -----------------------------
 BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from explanations import decision_engine, explanation_messages
+from llm_providers import create_provider, complete_many
+
 KPI_PATH = BASE_DIR / "data" / "processed" / "saas_kpis.csv"
 
 df = pd.read_csv(KPI_PATH)
 df = df.sort_values("month")
 
-latest = df.iloc[-1]
+rows = [row for _, row in df.iterrows()]
 
-# -----------------------------
-# DECISION
-# -----------------------------
-decision = {
-    "decision_type": "RETENTION_PRIORITY",
-    "confidence": "HIGH",
-    "reason": "Revenue churn is above 10%"
-}
+# Same decision rules and prompt as the API
+decisions = [decision_engine(row) for row in rows]
+message_lists = [
+    explanation_messages(row, decision)
+    for row, decision in zip(rows, decisions)
+]
 
 # -----------------------------
-# BUILD PROMPT
+# CALL LLM (all months in parallel)
 # -----------------------------
-prompt = f"""
-You are a senior SaaS business advisor.
-
-Rules:
-- Do NOT calculate metrics
-- Do NOT invent numbers
-- Do NOT change the decision
+provider = create_provider(os.getenv("LLM_PROVIDER", "ollama"))
 
-Decision:
-{decision}
+start = time.perf_counter()
+explanations = complete_many(provider, message_lists)
+elapsed = time.perf_counter() - start
 
-KPIs:
-Revenue churn %: {latest['revenue_churn_pct']:.2f}
-Net MRR growth %: {latest['net_mrr_growth_pct']:.2f}
-Customer churn %: {latest['customer_churn_pct']:.2f}
-
-Explain this decision clearly to a SaaS founder.
-"""
-
-# -----------------------------
-# CALL OLLAMA SERVER
-# -----------------------------
-response = requests.post(
-    "http://localhost:11434/api/generate",
-    json={
-        "model": "tinyllama",
-        "prompt": prompt,
-        "stream": False
-    }
-)
+for row, decision, explanation in zip(rows, decisions, explanations):
+    print(f"\n🧠 AI EXPLANATION — {row['month']} ({decision['decision_type']}):\n")
+    print(explanation)
 
-if response.status_code == 200:
-    result = response.json()
-    print("\n🧠 AI EXPLANATION:\n")
-    print(result["response"])
-else:
-    print("❌ Error:", response.status_code)
-    print(response.text)
+print(f"\n✅ {len(rows)} explanations from {provider.name}/{provider.model} in {elapsed:.2f}s")
@@ -0,0 +1,37 @@
+import pandas as pd
+from pathlib import Path
+import sys
+import time
+
+print("🧠 MATERIALIZING AI EXPLANATIONS")
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from explanations import EXPLANATIONS_PATH, materialize
+from llm_providers import create_provider
+
+KPI_PATH = BASE_DIR / "data" / "processed" / "saas_kpis.csv"
+
+df = pd.read_csv(KPI_PATH)
+print("KPI DATA LOADED")
+
+# -----------------------------
+# GENERATE (changed months only)
+# -----------------------------
+# Uses the same LLM_PROVIDER / LLM_MODEL as the API, so /analyze can
+# serve these entries without calling the LLM.
+provider = create_provider()
+
+start = time.perf_counter()
+generated, reused, failures = materialize(df, provider)
+elapsed = time.perf_counter() - start
+
+print(f"✅ {generated} generated, {reused} unchanged ({provider.name}/{provider.model}, {elapsed:.2f}s)")
+print(f"📄 Explanations saved at {EXPLANATIONS_PATH}")
+
+if failures:
+    print(f"❌ {len(failures)} month(s) failed and will be retried on the next run:")
+    for month, error in failures.items():
+        print(f"   {month}: {error}")
+    sys.exit(1)
@@ -1,6 +1,7 @@
 import pandas as pd
 from pathlib import Path
-import requests
+import os
+import sys
 
 print("🚀 DECISIOAI FULL BUSINESS ANALYSIS")
 
@@ -8,6 +9,11 @@ print("🚀 DECISIOAI FULL BUSINESS ANALYSIS")
 # LOAD KPI DATA
 # -----------------------------
 BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from explanations import decision_engine, explanation_messages
+from llm_providers import create_provider
+
 KPI_PATH = BASE_DIR / "data" / "processed" / "saas_kpis.csv"
 
 df = pd.read_csv(KPI_PATH)
@@ -18,72 +24,25 @@ latest = df.iloc[-1]
 print("\n📊 Latest Month:", latest["month"])
 
 # -----------------------------
-# DECISION ENGINE (Simple Rules)
+# DECISION + PROMPT (shared with the API)
 # -----------------------------
-decision = None
-
-if latest["revenue_churn_pct"] > 0.10:
-    decision = {
-        "decision_type": "RETENTION_PRIORITY",
-        "confidence": "HIGH",
-        "reason": "Revenue churn is above 10%"
-    }
-
-elif latest["net_mrr_growth_pct"] < 0.05:
-    decision = {
-        "decision_type": "GROWTH_SLOWDOWN",
-        "confidence": "MEDIUM",
-        "reason": "Net MRR growth is below 5%"
-    }
-
-else:
-    decision = {
-        "decision_type": "STABLE_GROWTH",
-        "confidence": "MEDIUM",
-        "reason": "Business metrics are stable"
-    }
+decision = decision_engine(latest)
 
 print("\n🧠 Decision Detected:")
 print(decision)
 
-# -----------------------------
-# BUILD AI PROMPT
-# -----------------------------
-prompt = f"""
-You are a senior SaaS business advisor.
-
-Rules:
-- Do NOT calculate metrics
-- Do NOT invent numbers
-- Do NOT change the decision
-
-Decision:
-{decision}
-
-KPIs:
-Revenue churn %: {latest['revenue_churn_pct']:.2f}
-Net MRR growth %: {latest['net_mrr_growth_pct']:.2f}
-Customer churn %: {latest['customer_churn_pct']:.2f}
-
-Explain this decision clearly to a SaaS founder.
-"""
+messages = explanation_messages(latest, decision)
 
 # -----------------------------
-# CALL OLLAMA
+# CALL LLM (ollama by default, set LLM_PROVIDER to switch)
 # -----------------------------
-response = requests.post(
-    "http://localhost:11434/api/generate",
-    json={
-        "model": "tinyllama",
-        "prompt": prompt,
-        "stream": False
-    }
-)
+provider = create_provider(os.getenv("LLM_PROVIDER", "ollama"))
+
+print("\n🧠 AI BUSINESS ADVICE:\n")
 
-if response.status_code == 200:
-    result = response.json()
-    print("\n🧠 AI BUSINESS ADVICE:\n")
-    print(result["response"])
-else:
-    print("❌ Error:", response.status_code)
-    print(response.text)
+try:
+    for text in provider.stream(messages):
+        print(text, end="", flush=True)
+    print()
+except Exception as exc:
+    print("\n❌ Error:", exc)
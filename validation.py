@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+
+# ==========================================
+# Schema
+# ==========================================
+
+REQUIRED_COLUMNS = [
+    "month",
+    "starting_mrr",
+    "new_mrr",
+    "expansion_mrr",
+    "churned_mrr",
+    "ending_mrr",
+    "active_users",
+    "new_customers",
+    "churned_customers",
+    "marketing_spend",
+    "net_mrr_growth_pct",
+    "revenue_churn_pct",
+    "customer_churn_pct"
+]
+
+NUMERIC_COLUMNS = REQUIRED_COLUMNS[1:]
+
+NON_NEGATIVE_COLUMNS = [
+    "starting_mrr",
+    "new_mrr",
+    "expansion_mrr",
+    "churned_mrr",
+    "ending_mrr",
+    "active_users",
+    "new_customers",
+    "churned_customers",
+    "marketing_spend",
+    "revenue_churn_pct",
+    "customer_churn_pct"
+]
+
+# ratio column -> (numerator, denominator), as computed by kpi_calculator.py
+RATIO_COLUMNS = {
+    "net_mrr_growth_pct": ("net_mrr_growth", "starting_mrr"),
+    "revenue_churn_pct": ("churned_mrr", "starting_mrr"),
+    "customer_churn_pct": ("churned_customers", "active_users"),
+}
+
+# Absolute, in currency units: the MRR identity must hold to the cent
+MRR_ABS_TOLERANCE = 0.01
+RATIO_TOLERANCE = 1e-4
+
+MAX_VIOLATIONS = 50
+
+# Column positions in the numeric matrix, resolved once
+_COL = {col: i for i, col in enumerate(NUMERIC_COLUMNS)}
+_NON_NEGATIVE_IDX = [_COL[col] for col in NON_NEGATIVE_COLUMNS]
+
+
+# ==========================================
+# Validator
+# ==========================================
+
+def _numeric_matrix(df):
+    frame = df[NUMERIC_COLUMNS]
+
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in frame.dtypes):
+        return frame.to_numpy(dtype="float64"), np.zeros(frame.shape, dtype=bool)
+
+    coerced = frame.apply(pd.to_numeric, errors="coerce")
+    bad_type = coerced.isna().to_numpy() & frame.notna().to_numpy()
+    return coerced.to_numpy(dtype="float64"), bad_type
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = numerator / denominator
+    ratio[~np.isfinite(ratio)] = 0
+    return ratio
+
+
+def _month_ordinals(months):
+    """Return (ordinals, missing, bad_format) for the month column."""
+    # Parse each distinct label once and broadcast back to the rows;
+    # blank cells get code -1 and are reported as missing
+    codes, labels = pd.factorize(months)
+    missing = codes == -1
+
+    parsed = pd.to_datetime(pd.Series(labels).astype(str), format="%Y-%m", errors="coerce")
+    ordinals = np.append((parsed.dt.year * 12 + parsed.dt.month).to_numpy(dtype="float64"), np.nan)
+    unparsed = np.append(parsed.isna().to_numpy(), False)
+
+    return ordinals[codes], missing, unparsed[codes]
+
+
+def validate_kpi_frame(df, max_violations=MAX_VIOLATIONS):
+    """
+    Check an uploaded KPI table against the full schema.
+
+    Returns (violation_count, violations) where violations is capped at
+    max_violations and each entry is {"row", "column", "message"}.
+    Row numbers are CSV line numbers (the header is line 1).
+    """
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+
+    if missing:
+        return 1, [{
+            "row": None,
+            "column": None,
+            "message": f"Missing required columns: {missing}"
+        }]
+
+    values, bad_type = _numeric_matrix(df)
+    null = np.isnan(values) & ~bad_type
+    usable = ~np.isnan(values)
+
+    checks = []
+
+    # -----------------------------
+    # Types, nulls and ranges
+    # -----------------------------
+    checks.append((bad_type, NUMERIC_COLUMNS, "Value is not numeric."))
+    checks.append((null, NUMERIC_COLUMNS, "Missing value."))
+
+    negative = np.zeros_like(null)
+    negative[:, _NON_NEGATIVE_IDX] = values[:, _NON_NEGATIVE_IDX] < 0
+    checks.append((negative, NUMERIC_COLUMNS, "Value cannot be negative."))
+
+    # -----------------------------
+    # MRR identity
+    # -----------------------------
+    start = values[:, _COL["starting_mrr"]]
+    end = values[:, _COL["ending_mrr"]]
+    expected_end = (
+        start
+        + values[:, _COL["new_mrr"]]
+        + values[:, _COL["expansion_mrr"]]
+        - values[:, _COL["churned_mrr"]]
+    )
+    identity = np.abs(expected_end - end) > MRR_ABS_TOLERANCE
+    checks.append((
+        identity[:, None],
+        ["ending_mrr"],
+        "ending_mrr does not equal starting + new + expansion - churned MRR."
+    ))
+
+    # -----------------------------
+    # Ratio columns
+    # -----------------------------
+    derived = {"net_mrr_growth": end - start}
+    derived.update({col: values[:, i] for col, i in _COL.items()})
+
+    for col, (numerator, denominator) in RATIO_COLUMNS.items():
+        expected = _ratio(derived[numerator], derived[denominator])
+        actual = values[:, _COL[col]]
+        mismatch = np.abs(actual - expected) > RATIO_TOLERANCE * np.maximum(1, np.abs(expected))
+        checks.append((
+            mismatch[:, None],
+            [col],
+            f"{col} does not match {numerator} / {denominator}."
+        ))
+
+    # -----------------------------
+    # Months
+    # -----------------------------
+    ordinals, missing_month, bad_month = _month_ordinals(df["month"])
+    duplicate = df["month"].duplicated(keep="first").to_numpy() & ~bad_month & ~missing_month
+    step = np.diff(ordinals, prepend=np.nan)
+    out_of_order = (step <= 0) & ~duplicate
+
+    # A duplicate usually stands in for the month that should have followed,
+    # so the next row isn't also reported as a gap
+    after_duplicate = np.roll(duplicate, 1)
+    after_duplicate[:1] = False
+    gap = (step > 1) & ~duplicate & ~after_duplicate
+
+    checks.append((missing_month[:, None], ["month"], "Missing value."))
+    checks.append((bad_month[:, None], ["month"], "Month must be formatted as YYYY-MM."))
+    checks.append((duplicate[:, None], ["month"], "Duplicate month."))
+    checks.append((out_of_order[:, None], ["month"], "Month is out of order."))
+    checks.append((gap[:, None], ["month"], "Month does not follow the previous month."))
+
+    # -----------------------------
+    # Report
+    # -----------------------------
+    violation_count = 0
+    violations = []
+
+    for mask, columns, message in checks:
+        # Rows with unusable inputs are already reported as type/null errors
+        if len(columns) == 1 and columns[0] != "month":
+            mask = mask & usable.all(axis=1)[:, None]
+
+        rows, cols = np.nonzero(mask)
+        violation_count += len(rows)
+
+        for row, col in zip(rows[:max_violations - len(violations)], cols):
+            violations.append({
+                "row": int(row) + 2,
+                "column": columns[col],
+                "message": message
+            })
+
+    return violation_count, violations